@@ -29,6 +29,7 @@ from config import (
     generate_network_config,
     get_static_ip,
     image_format,
+    jinja_env,
     libvirt_uri,
     network_cidr,
     num_vms,
@@ -41,7 +42,6 @@ from config import (
     vm_ram,
 )
 from decouple import config
-from jinja2 import Environment, FileSystemLoader
 from textwrap import dedent
 
 
@@ -89,15 +89,9 @@ def create_cloud_init_disk(vm_index, vm_name, all_ssh_keys=None, github_ssh_user
     if use_jinja_templates:
         # Use the centralized cloud-init generation with static IP
         try:
-            from pathlib import Path
-
-            # Format SSH keys section for cloud-init with all keys
-            ssh_keys_section = "ssh_authorized_keys:\n" + "\n".join(f"  - {key}" for key in all_ssh_keys) if all_ssh_keys else ""
-
-            # Use the centralized template rendering with SSH keys
-            template_path = Path(__file__).parent / "templates"
-            env = Environment(loader=FileSystemLoader(template_path))
-            template = env.get_template("cloud-init.yml.j2")
+            # Use the centralized template rendering with SSH keys; the shared environment
+            # keeps the compiled template across VMs
+            template = jinja_env.get_template("cloud-init.yml.j2")
 
             cloud_init_config = template.render(
                 username="ubuntu",
@@ -105,7 +99,7 @@ def create_cloud_init_disk(vm_index, vm_name, all_ssh_keys=None, github_ssh_user
                 groups=["sudo"],
                 packages=["curl", "git", "openssh-server", "qemu-guest-agent", "wget"],
                 dns_servers=["8.8.8.8", "8.8.4.4"],
-                ssh_keys_section=ssh_keys_section,
+                ssh_keys=all_ssh_keys or [],
                 github_ssh_user=github_ssh_user,
                 hostname=vm_name,
             )
@@ -1,3 +1,4 @@
+import ipaddress
 import pulumi
 import pulumi_libvirt as libvirt
 from dataclasses import dataclass
@@ -6,24 +7,34 @@ from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
 from typing import Optional
 
+# Pulumi stack config, read once and shared by every setting below
+_pulumi_config = pulumi.Config()
+
+
+def _env(name: str, key: str, default, cast=str):
+    """Read a setting from the environment, falling back to Pulumi stack config and then `default`."""
+    stack_value = _pulumi_config.get_int(key, default) if cast is int else _pulumi_config.get(key, default)
+    return config(name, default=stack_value, cast=cast)
+
+
 # env vars
-libvirt_uri = config('LIBVIRT_DEFAULT_URI', default=pulumi.Config().get('libvirt_uri', 'qemu:///system'))
-num_vms = config('NUM_VMS', default=pulumi.Config().get_int('num_vms', 1), cast=int)
-vm_user = config('VM_USER', default=pulumi.Config().get('vm_user', 'ubuntu'))
-vm_pass = config('VM_PASS', default=pulumi.Config().get('vm_pass', 'ubuntu'))
+libvirt_uri = _env('LIBVIRT_DEFAULT_URI', 'libvirt_uri', 'qemu:///system')
+num_vms = _env('NUM_VMS', 'num_vms', 1, cast=int)
+vm_user = _env('VM_USER', 'vm_user', 'ubuntu')
+vm_pass = _env('VM_PASS', 'vm_pass', 'ubuntu')
 vm_pass = vm_pass if vm_pass else vm_user
-vm_cpu = config('VM_CPU', default=pulumi.Config().get_int('vm_cpu', 4), cast=int)
-vm_ram = config('VM_RAM', default=pulumi.Config().get_int('vm_ram', 8192), cast=int)
-vm_disk = config('VM_DISK', default=pulumi.Config().get_int('vm_disk', 32), cast=int)
-vm_bridge = config('VM_BRIDGE', default=pulumi.Config().get('vm_bridge', 'br0'))
-domain = config('DOMAIN', default=pulumi.Config().get('domain', 'pulumi.local'))
+vm_cpu = _env('VM_CPU', 'vm_cpu', 4, cast=int)
+vm_ram = _env('VM_RAM', 'vm_ram', 8192, cast=int)
+vm_disk = _env('VM_DISK', 'vm_disk', 32, cast=int)
+vm_bridge = _env('VM_BRIDGE', 'vm_bridge', 'br0')
+domain = _env('DOMAIN', 'domain', 'pulumi.local')
 dns_servers = [
-    config('DNS1', default=pulumi.Config().get('dns1', '8.8.8.8')),
-    config('DNS2', default=pulumi.Config().get('dns2', '8.8.4.4')),
+    _env('DNS1', 'dns1', '8.8.8.8'),
+    _env('DNS2', 'dns2', '8.8.4.4'),
 ]
-addr_start = config('ADDR_START', default=pulumi.Config().get('addr_start', '192.168.122.2'))
-addr_end = config('ADDR_END', default=pulumi.Config().get('addr_end', '192.168.122.254'))
-network_type = config('NETWORK_TYPE', default=pulumi.Config().get('network_type', 'bridge'))
+addr_start = _env('ADDR_START', 'addr_start', '192.168.122.2')
+addr_end = _env('ADDR_END', 'addr_end', '192.168.122.254')
+network_type = _env('NETWORK_TYPE', 'network_type', 'bridge')
 
 # Static IP configuration
 base_ip = config('BASE_IP', default='10.5.162')
@@ -34,20 +45,18 @@ network_cidr = config('NETWORK_CIDR', default='10.5.160.0/21')
 github_ssh_user = config('GITHUB_SSH_USER', default='')
 
 # VM and image configuration
-base_image_name = config('BASE_IMAGE_NAME', default=pulumi.Config().get('base_image_name', 'ubuntu-base-volume'))
-base_image_path = config(
-    'BASE_IMAGE_PATH', default=pulumi.Config().get('base_image_path', '/data/libvirt/images/ubuntu-24.04-base.qcow2')
-)
-vm_name_prefix = config('VM_NAME_PREFIX', default=pulumi.Config().get('vm_name_prefix', 'ubuntu'))
-storage_pool = config('STORAGE_POOL', default=pulumi.Config().get('storage_pool', 'default'))
-image_format = config('IMAGE_FORMAT', default=pulumi.Config().get('image_format', 'qcow2'))
+base_image_name = _env('BASE_IMAGE_NAME', 'base_image_name', 'ubuntu-base-volume')
+base_image_path = _env('BASE_IMAGE_PATH', 'base_image_path', '/data/libvirt/images/ubuntu-24.04-base.qcow2')
+vm_name_prefix = _env('VM_NAME_PREFIX', 'vm_name_prefix', 'ubuntu')
+storage_pool = _env('STORAGE_POOL', 'storage_pool', 'default')
+image_format = _env('IMAGE_FORMAT', 'image_format', 'qcow2')
 
 # pulumi provider
 provider = libvirt.Provider("libvirt", uri=libvirt_uri)
 
 # Jinja2 template environment
 template_dir = Path(__file__).parent / "templates"
-jinja_env = Environment(loader=FileSystemLoader(template_dir))
+jinja_env = Environment(loader=FileSystemLoader(template_dir), auto_reload=False)
 
 
 def get_static_ip(vm_index: int) -> str:
@@ -78,7 +87,7 @@ def generate_cloud_init_with_static_ip(vm_index: int, vm_name: str) -> str:
         groups=['sudo'],
         packages=['curl', 'git', 'openssh-server', 'qemu-guest-agent', 'wget'],
         dns_servers=dns_servers,
-        ssh_keys_section='',
+        ssh_keys=[],
         github_ssh_user=github_ssh_user,
         hostname=vm_name,
         static_ip=static_ip,
@@ -94,12 +103,16 @@ cloud_init_data = template.render(
     groups=['sudo'],
     packages=['curl', 'git', 'openssh-server', 'qemu-guest-agent', 'wget'],
     dns_servers=dns_servers,
-    ssh_keys_section='',
+    ssh_keys=[],
     github_ssh_user=github_ssh_user,
     hostname='ubuntu',
 )
 
 
+# Widest network get_cidr will derive from an address range
+_MIN_CIDR_PREFIX = 16
+
+
 @dataclass
 class NetworkConfig:
     name: str
@@ -111,16 +124,27 @@ class NetworkConfig:
     address_end: str | None = None
 
     def get_cidr(self) -> str | None:
-        """Extract CIDR notation from address_start."""
+        """Extract CIDR notation from address_start, widened to cover address_end."""
         if not self.address_start:
             return None
 
-        # Extract base IP from address_start (e.g., "192.168.122.2" -> "192.168.122.0/24")
-        parts = self.address_start.split('.')
-        if len(parts) == 4:
-            base_ip = f"{parts[0]}.{parts[1]}.{parts[2]}.0/24"
-            return base_ip
-        return None
+        # Start from the /24 around address_start (e.g., "192.168.122.2" -> "192.168.122.0/24")
+        try:
+            start = ipaddress.ip_address(self.address_start)
+            end = ipaddress.ip_address(self.address_end) if self.address_end else start
+        except ValueError:
+            return None
+        if start.version != 4 or end.version != 4:
+            return None
+        network = ipaddress.ip_network(f"{start}/24", strict=False)
+
+        # Grow the prefix until the range end fits, for ranges that span more than a /24; a range that
+        # doesn't fit within a /16 is treated as misconfigured rather than widened towards 0.0.0.0/0
+        while end not in network:
+            if network.prefixlen <= _MIN_CIDR_PREFIX:
+                return None
+            network = network.supernet()
+        return str(network)
 
 
 # Network configurations
@@ -1,20 +1,33 @@
 #!/usr/bin/env python
 
+import asyncio
+import atexit
 import base64
 import contextlib
+import fcntl
+import functools
 import hashlib
-import jinja2
+import http.client
 import json
 import libvirt
+import logging
 import os
-import paramiko
+import platform
+import re
 import sh
+import shlex
+import shutil
+import socket
+import threading
+import time
 import urllib.request
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from decouple import config
 from pathlib import Path
 from sh import CommandNotFound, ErrorReturnCode
 from urllib.parse import urlparse
+from xml.sax.saxutils import escape as xml_escape
 
 
 def import_sh_cmd(cmd_name):
@@ -25,19 +38,278 @@ def import_sh_cmd(cmd_name):
         return None
 
 
+log = logging.getLogger(__name__)
+
 # Import shell commands with fallbacks
+aria2c = import_sh_cmd('aria2c')
 arp = import_sh_cmd('arp')
-pulumi = import_sh_cmd('pulumi')
+cloud_init = import_sh_cmd('cloud-init')
+qemu_img = import_sh_cmd('qemu-img')
 scp = import_sh_cmd('scp')
 sudo = import_sh_cmd('sudo')
 
+# Upper bound on how much subprocess stderr is decoded into error messages
+_MAX_ERROR_BYTES = 4096
+
+# Worker cap for fanning per-domain libvirt calls out over threads
+_MAX_WORKERS = 16
+
+# Shared pool for DHCP lease lookups, so get_vm_ip doesn't spin up threads on every call
+_lease_executor = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="dhcp-lease")
+
+# Shared pool for libvirt calls that run off the request path or fan out across VMs
+_task_executor = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="libvirt-task")
+
+# Resolve the pulumi binary once; commands are run through asyncio subprocesses
+pulumi_bin = shutil.which('pulumi')
+
+# Pulumi commands that take the stack lock; these are run one at a time
+_PULUMI_MUTATING_COMMANDS = frozenset({'up', 'destroy', 'refresh'})
+_pulumi_update_lock = asyncio.Lock()
+
 # Default libvirt URI
 LIBVIRT_DEFAULT_URI = config("LIBVIRT_DEFAULT_URI", default="qemu:///system")
 
+# Shared libvirt connections keyed by URI, opened lazily and reused across tool calls
+_libvirt_conns = {}
+_libvirt_conn_uris = {}
+_libvirt_conn_lock = threading.Lock()
+_libvirt_event_loop_started = False
+
+# Domain activity learned from lifecycle events, keyed by (uri, domain uuid) -> is_active.
+# Only URIs whose event subscription succeeded are tracked; the rest always ask libvirtd.
+_DOMAIN_ACTIVE = {}
+_domain_event_uris = set()
+
+# Keepalive probe every 5s; the connection is closed after 3 unanswered probes
+_KEEPALIVE_INTERVAL = 5
+_KEEPALIVE_COUNT = 3
+
+# Cached paramiko clients keyed by (username, hostname)
+_ssh_clients = {}
+_ssh_clients_lock = threading.Lock()
+_SSH_KEEPALIVE_INTERVAL = 30
+
+# Short-lived cache of domain XML keyed by (uri, domain uuid) -> {flags: (fetched_at, xml)}
+_XMLDESC_CACHE = {}
+_XMLDESC_TTL = 2.0
+
+# Short-lived cache of defined domain names keyed by uri -> (fetched_at, names)
+_DOMAIN_NAMES_CACHE = {}
+_DOMAIN_NAMES_TTL = 2.0
+
+# Short-lived cache of resolved VM IPs keyed by (uri, vm name, network_name) -> (resolved_at, result)
+_VM_IP_CACHE = {}
+_VM_IP_TTL = 2.0
+
+
+def _get_libvirt_conn(uri=None):
+    """Return the shared libvirt connection for a URI, (re)opening it when needed.
+
+    Opening a connection is expensive on remote URIs (qemu+ssh:// performs a full
+    SSH handshake), so one handle per URI is kept for the life of the process and
+    only replaced once libvirt reports it is no longer alive.
+
+    Args:
+        uri: Libvirt URI (defaults to LIBVIRT_DEFAULT_URI)
+
+    Raises:
+        libvirt.libvirtError: If a new connection cannot be opened.
+    """
+    uri = uri or LIBVIRT_DEFAULT_URI
+    with _libvirt_conn_lock:
+        conn = _libvirt_conns.get(uri)
+        if conn is not None:
+            try:
+                if conn.isAlive():
+                    return conn
+            except libvirt.libvirtError:
+                pass
+            del _libvirt_conns[uri]
+            _libvirt_conn_uris.pop(conn, None)
+            with contextlib.suppress(libvirt.libvirtError):
+                conn.close()
+
+        _start_libvirt_event_loop()
+        conn = libvirt.open(uri)
+        # Let libvirt probe the peer so a dead remote is noticed by isAlive()
+        with contextlib.suppress(libvirt.libvirtError):
+            conn.setKeepAlive(_KEEPALIVE_INTERVAL, _KEEPALIVE_COUNT)
+        _subscribe_domain_events(conn, uri)
+        _libvirt_conns[uri] = conn
+        _libvirt_conn_uris[conn] = uri
+        return conn
+
+
+def _conn_uri(conn):
+    """Return the URI a shared connection was opened with, so per-URI caches key on the right host."""
+    return _libvirt_conn_uris.get(conn, LIBVIRT_DEFAULT_URI)
+
+
+def _subscribe_domain_events(conn, uri):
+    """Track domain activity for a fresh connection from lifecycle events.
+
+    States seen on a previous connection may have missed events while it was down,
+    so they are dropped before subscribing again.
+    """
+    _domain_event_uris.discard(uri)
+    # Snapshot the keys; the event loop and tool threads may insert while we scan
+    for key in [key for key in list(_DOMAIN_ACTIVE) if key[0] == uri]:
+        _DOMAIN_ACTIVE.pop(key, None)
+    try:
+        conn.domainEventRegisterAny(None, libvirt.VIR_DOMAIN_EVENT_ID_LIFECYCLE, _on_domain_lifecycle, uri)
+    except libvirt.libvirtError as e:
+        log.debug("Domain lifecycle events unavailable for %s: %s", uri, e)
+        return
+    _domain_event_uris.add(uri)
+
+
+def _on_domain_lifecycle(conn, dom, event, detail, uri):
+    """Record a domain's activity from a lifecycle event (runs on the libvirt event loop)."""
+    key = (uri, dom.UUIDString())
+    if event in (
+        libvirt.VIR_DOMAIN_EVENT_STARTED,
+        libvirt.VIR_DOMAIN_EVENT_RESUMED,
+        libvirt.VIR_DOMAIN_EVENT_SUSPENDED,
+        libvirt.VIR_DOMAIN_EVENT_PMSUSPENDED,
+    ):
+        _DOMAIN_ACTIVE[key] = True
+    elif event == libvirt.VIR_DOMAIN_EVENT_STOPPED:
+        _DOMAIN_ACTIVE[key] = False
+    elif event in (libvirt.VIR_DOMAIN_EVENT_UNDEFINED, libvirt.VIR_DOMAIN_EVENT_CRASHED):
+        # Crashed domains may be kept around or torn down depending on on_crash; ask next time
+        _DOMAIN_ACTIVE.pop(key, None)
+
+
+def _domain_is_active(domain):
+    """Return domain.isActive(), answered from lifecycle events when the connection has them."""
+    uri = _conn_uri(domain.connect())
+    if uri not in _domain_event_uris:
+        return domain.isActive()
+
+    key = (uri, domain.UUIDString())
+    is_active = _DOMAIN_ACTIVE.get(key)
+    if is_active is None:
+        # An event that lands while we ask takes precedence over this answer
+        is_active = _DOMAIN_ACTIVE.setdefault(key, bool(domain.isActive()))
+    return is_active
+
+
+def _forget_domain_state(domain):
+    """Drop the tracked activity of a domain so the next check asks libvirtd."""
+    _DOMAIN_ACTIVE.pop((_conn_uri(domain.connect()), domain.UUIDString()), None)
+
+
+def _start_libvirt_event_loop():
+    """Register and run libvirt's default event loop once (needed for keepalives)."""
+    global _libvirt_event_loop_started
+    if _libvirt_event_loop_started:
+        return
+    libvirt.virEventRegisterDefaultImpl()
+
+    def _run():
+        while True:
+            libvirt.virEventRunDefaultImpl()
+
+    threading.Thread(target=_run, name="libvirt-event-loop", daemon=True).start()
+    _libvirt_event_loop_started = True
+
+
+@atexit.register
+def _close_libvirt_conns():
+    """Close all shared libvirt connections on interpreter exit."""
+    with _libvirt_conn_lock:
+        conns = list(_libvirt_conns.values())
+        _libvirt_conns.clear()
+        _libvirt_conn_uris.clear()
+    for conn in conns:
+        with contextlib.suppress(libvirt.libvirtError):
+            conn.close()
+
+
+def _prune_expired(cache, ttl, now):
+    """Drop entries older than `ttl` from a {key: (stored_at, value)} cache.
+
+    Called whenever a lookup misses, so entries for VMs, hosts or directories that are
+    never asked about again don't accumulate for the life of the process.
+    """
+    for key, entry in list(cache.items()):
+        if now - entry[0] >= ttl:
+            cache.pop(key, None)
 
-def _pulumi_command(command, timeout=300):
+
+def _cached_xmldesc(domain, flags=0):
+    """Return domain.XMLDesc(flags), reusing a recent result for the same domain and flags.
+
+    Consecutive tool calls against the same VM (e.g. get_vm_config then rename_vm)
+    avoid re-fetching the XML over the libvirt RPC while the entry is fresh.
+    """
+    key = (_conn_uri(domain.connect()), domain.UUIDString())
+    cached = _XMLDESC_CACHE.get(key, {}).get(flags)
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < _XMLDESC_TTL:
+        return cached[1]
+
+    for other_key, by_flags in list(_XMLDESC_CACHE.items()):
+        _prune_expired(by_flags, _XMLDESC_TTL, now)
+        if not by_flags:
+            _XMLDESC_CACHE.pop(other_key, None)
+
+    by_flags = _XMLDESC_CACHE.setdefault(key, {})
+    xml_desc = domain.XMLDesc(flags)
+    by_flags[flags] = (now, xml_desc)
+    return xml_desc
+
+
+def _domain_names(conn):
+    """Return the set of defined domain names, reusing a listing fetched in the last few seconds."""
+    uri = _conn_uri(conn)
+    cached = _DOMAIN_NAMES_CACHE.get(uri)
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < _DOMAIN_NAMES_TTL:
+        return cached[1]
+
+    _prune_expired(_DOMAIN_NAMES_CACHE, _DOMAIN_NAMES_TTL, now)
+    names = frozenset(dom.name() for dom in conn.listAllDomains())
+    _DOMAIN_NAMES_CACHE[uri] = (now, names)
+    return names
+
+
+def _invalidate_xmldesc(domain):
+    """Drop any cached XML for a domain after its definition changes."""
+    _XMLDESC_CACHE.pop((_conn_uri(domain.connect()), domain.UUIDString()), None)
+
+
+def _cached_vm_ip(conn, vm_name, network_name):
+    """Return a recently resolved IP result for a VM, or None if there is no fresh entry."""
+    cached = _VM_IP_CACHE.get((_conn_uri(conn), vm_name, network_name))
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < _VM_IP_TTL:
+        return cached[1]
+    _prune_expired(_VM_IP_CACHE, _VM_IP_TTL, now)
+    return None
+
+
+def _remember_vm_ip(conn, vm_name, network_name, result):
+    """Cache a successful IP lookup so repeated get_vm_ip calls skip the libvirtd RPCs, and return it."""
+    _VM_IP_CACHE[(_conn_uri(conn), vm_name, network_name)] = (time.monotonic(), result)
+    return result
+
+
+def _invalidate_vm_ip(conn, vm_name):
+    """Drop cached IPs for a VM after it starts, stops or is renamed."""
+    uri = _conn_uri(conn)
+    for key in list(_VM_IP_CACHE):
+        if key[0] == uri and key[1] == vm_name:
+            _VM_IP_CACHE.pop(key, None)
+
+
+async def _pulumi_command(command, timeout=300):
     """Execute pulumi command with JSON output and return parsed result.
 
+    The command runs as an asyncio subprocess so long operations such as
+    `pulumi up` don't block the MCP event loop.
+
     Args:
         command: List of command arguments (e.g., ['up', '--yes'])
         timeout: Command timeout in seconds
@@ -45,59 +317,87 @@ def _pulumi_command(command, timeout=300):
     Returns:
         tuple: (success: bool, result: dict, error_message: str or None)
     """
-    try:
-        if pulumi is None:
-            return False, None, "pulumi command not available. Please install pulumi."
+    if pulumi_bin is None:
+        return False, None, "pulumi command not available. Please install pulumi."
 
-        # Always add --non-interactive and --json for programmatic access
-        full_cmd = command + ['--non-interactive', '--json']
+    # Always add --non-interactive and --json for programmatic access
+    full_cmd = command + ['--non-interactive', '--json']
 
-        result = pulumi(*full_cmd, _timeout=timeout, _cwd=Path(__file__).parent)
-        output = result.stdout.decode().strip()
+    # Concurrent updates against one stack fail on Pulumi's stack lock, so queue them here
+    if command[0] in _PULUMI_MUTATING_COMMANDS:
+        async with _pulumi_update_lock:
+            try:
+                return await _run_pulumi(full_cmd, timeout)
+            finally:
+                # Updates may create, replace or remove VMs, so previously resolved IPs are stale
+                _VM_IP_CACHE.clear()
+    return await _run_pulumi(full_cmd, timeout)
 
-        # Parse JSON output
-        try:
-            json_result = json.loads(output)
-            return True, json_result, None
-        except json.JSONDecodeError:
-            # Some commands might not return JSON, return raw output
-            return True, {'output': output}, None
 
-    except ErrorReturnCode as e:
-        error_msg = e.stderr.decode() if e.stderr else str(e)
-        return False, None, f"Pulumi command failed: {error_msg}"
-    except Exception as e:
+async def _run_pulumi(full_cmd, timeout):
+    """Run a pulumi invocation and return (success, result, error_message)."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            pulumi_bin,
+            *full_cmd,
+            cwd=Path(__file__).parent,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError as e:
         return False, None, f"Failed to run pulumi command: {str(e)}"
 
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return False, None, f"Failed to run pulumi command: timed out after {timeout}s"
+
+    if proc.returncode != 0:
+        # Only the tail of stderr is useful and it can run to megabytes
+        error_msg = stderr[-_MAX_ERROR_BYTES:].decode(errors="replace") if stderr else f"exit code {proc.returncode}"
+        return False, None, f"Pulumi command failed: {error_msg}"
+
+    output = stdout.decode().strip()
+
+    # Parse JSON output
+    try:
+        json_result = json.loads(output)
+        return True, json_result, None
+    except json.JSONDecodeError:
+        # Some commands might not return JSON, return raw output
+        return True, {'output': output}, None
+
 
-def _pulumi_preview():
+async def _pulumi_preview():
     """Run pulumi preview and return the result.
 
     Returns:
         tuple: (success: bool, result: dict, error_message: str or None)
     """
-    return _pulumi_command(['preview'])
+    return await _pulumi_command(['preview'])
 
 
-def _pulumi_up():
+async def _pulumi_up():
     """Run pulumi up and return the result.
 
     Returns:
         tuple: (success: bool, result: dict, error_message: str or None)
     """
-    return _pulumi_command(['up', '--yes'])
+    return await _pulumi_command(['up', '--yes'])
 
 
-def _pulumi_destroy():
+async def _pulumi_destroy():
     """Run pulumi destroy and return the result.
 
     Returns:
         tuple: (success: bool, result: dict, error_message: str or None)
     """
-    return _pulumi_command(['destroy', '--yes'])
+    return await _pulumi_command(['destroy', '--yes'])
 
 
-def _pulumi_stack_output(output_name=None):
+async def _pulumi_stack_output(output_name=None):
     """Get pulumi stack output.
 
     Args:
@@ -109,7 +409,76 @@ def _pulumi_stack_output(output_name=None):
     cmd = ['stack', 'output']
     if output_name:
         cmd.append(output_name)
-    return _pulumi_command(cmd)
+    return await _pulumi_command(cmd)
+
+
+def _get_ssh_client(username, hostname, timeout=30):
+    """Return a connected SSHClient for the host, reusing an open transport.
+
+    Each new SSHClient pays a TCP connect, key exchange and authentication, so
+    clients are cached per (username, hostname) and every command runs as a new
+    channel on the existing transport.
+    """
+    # Imported here so servers that never talk SSH don't pay for loading paramiko/cryptography
+    import paramiko
+
+    key = (username, hostname)
+    with _ssh_clients_lock:
+        ssh_client = _ssh_clients.get(key)
+        if ssh_client is not None:
+            transport = ssh_client.get_transport()
+            if transport is not None and transport.is_active():
+                return ssh_client
+            ssh_client.close()
+            del _ssh_clients[key]
+
+        ssh_client = paramiko.SSHClient()
+        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            # Bound every handshake phase, not just the TCP connect, so a stalled host can't hang a tool call
+            ssh_client.connect(hostname, username=username, timeout=timeout, banner_timeout=timeout, auth_timeout=timeout)
+            # Keep idle sessions from being dropped by NAT/firewalls between tool calls
+            ssh_client.get_transport().set_keepalive(_SSH_KEEPALIVE_INTERVAL)
+        except BaseException:
+            # A failed handshake can leave the socket open; it was never cached, so close it here
+            ssh_client.close()
+            raise
+        _ssh_clients[key] = ssh_client
+        return ssh_client
+
+
+def _drop_ssh_client(username, hostname):
+    """Close and forget a cached SSHClient so the next call reconnects."""
+    with _ssh_clients_lock:
+        ssh_client = _ssh_clients.pop((username, hostname), None)
+    if ssh_client is not None:
+        ssh_client.close()
+
+
+@atexit.register
+def _close_ssh_clients():
+    """Close all cached SSH clients on interpreter exit."""
+    with _ssh_clients_lock:
+        ssh_clients = list(_ssh_clients.values())
+        _ssh_clients.clear()
+    for ssh_client in ssh_clients:
+        ssh_client.close()
+
+
+# Format: qemu+ssh://user@host/system (also the qemu+libssh:// and qemu+libssh2:// transports)
+_SSH_URI_RE = re.compile(r'^(?P<driver>[a-z0-9]+)\+(?:lib)?ssh2?://(?P<host_part>[^/?]+)(?P<path>[^?]*)', re.IGNORECASE)
+
+
+def _ssh_host_part(uri):
+    """Return the `user@host` part of an ssh libvirt URI, or None for other transports."""
+    match = _SSH_URI_RE.match(uri)
+    return match.group('host_part') if match else None
+
+
+def _ssh_local_uri(uri):
+    """Return the URI to use on the far side of an ssh libvirt URI (qemu+ssh://host/system -> qemu:///system)."""
+    match = _SSH_URI_RE.match(uri)
+    return f"{match.group('driver')}://{match.group('path')}" if match else None
 
 
 def ssh_cmd(host, command, timeout=30):
@@ -123,22 +492,20 @@ def ssh_cmd(host, command, timeout=30):
     Returns:
         tuple: (success: bool, stdout: str, stderr: str)
     """
-    try:
-        # Parse host string
-        if "@" in host:
-            username, hostname = host.split("@", 1)
-        else:
-            username = "root"
-            hostname = host
+    # Parse host string
+    if "@" in host:
+        username, hostname = host.split("@", 1)
+    else:
+        username = "root"
+        hostname = host
 
-        # Convert command list to string if needed
-        if isinstance(command, list):
-            command = " ".join(command)
+    # Convert command list to string if needed
+    if isinstance(command, list):
+        command = " ".join(command)
 
-        # Connect via SSH
-        ssh_client = paramiko.SSHClient()
-        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh_client.connect(hostname, username=username, timeout=timeout)
+    try:
+        # Reuse the cached connection to this host
+        ssh_client = _get_ssh_client(username, hostname, timeout=timeout)
 
         # Execute command
         stdin, stdout, stderr = ssh_client.exec_command(command, timeout=timeout)
@@ -148,27 +515,34 @@ def ssh_cmd(host, command, timeout=30):
         stderr_str = stderr.read().decode().strip()
         exit_code = stdout.channel.recv_exit_status()
 
-        ssh_client.close()
-
         return exit_code == 0, stdout_str, stderr_str
 
     except Exception as e:
+        # paramiko is already loaded by _get_ssh_client; importing it only here keeps the
+        # success path free of import statements
+        import paramiko
+
+        if not isinstance(e, (OSError, UnicodeDecodeError, paramiko.SSHException)):
+            raise
+        # Don't keep a connection around that may be in a bad state
+        _drop_ssh_client(username, hostname)
         return False, "", str(e)
 
 
+# Schemes treated as downloadable image URLs
+_URL_PREFIXES = ('http://', 'https://', 'ftp://', 'ftps://')
+
+
 def _is_url(path_or_url):
     """Check if the given string is a URL."""
-    try:
-        parsed = urlparse(path_or_url)
-        return parsed.scheme in ('http', 'https', 'ftp', 'ftps')
-    except Exception:
-        return False
+    # Schemes are case-insensitive; the longest prefix is 8 characters
+    return isinstance(path_or_url, str) and path_or_url[:8].lower().startswith(_URL_PREFIXES)
 
 
 def _get_cache_path(url):
     """Generate a cached file path for a URL."""
     # Create a hash of the URL for the filename
-    url_hash = hashlib.md5(url.encode()).hexdigest()
+    url_hash = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
     parsed = urlparse(url)
     filename = os.path.basename(parsed.path)
     if not filename:
@@ -180,26 +554,108 @@ def _get_cache_path(url):
     return cache_path
 
 
+# Read size for image downloads; large reads keep the copy loop out of the interpreter
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+# Parallel connections per download when aria2c is available
+_DOWNLOAD_CONNECTIONS = 8
+
+# Download lock files live outside the image directory so they never show up as pool volumes
+_DOWNLOAD_LOCK_DIR = Path(config("XDG_CACHE_HOME", default=str(Path.home() / ".cache"))) / "libvirt-mcp" / "locks"
+
+
+def _download_image_parallel(url, cache_path):
+    """Download with aria2c over several ranged connections. Returns (success, error)"""
+    conns = str(_DOWNLOAD_CONNECTIONS)
+    try:
+        aria2c(
+            "--quiet",
+            "--allow-overwrite=true",
+            "--auto-file-renaming=false",
+            "--file-allocation=falloc",
+            "-x",
+            conns,
+            "-s",
+            conns,
+            "-d",
+            str(cache_path.parent),
+            "-o",
+            cache_path.name,
+            url,
+        )
+        return True, None
+    except ErrorReturnCode as e:
+        return False, e.stderr.decode(errors="replace")[-_MAX_ERROR_BYTES:]
+
+
+def _discard_partial_download(part_path):
+    """Remove a failed download's .part file and aria2c's control file."""
+    part_path.unlink(missing_ok=True)
+    part_path.with_name(part_path.name + '.aria2').unlink(missing_ok=True)
+
+
 def _download_image(url, cache_path):
     """Download an image from URL to cache path."""
+    # Download next to the target and rename into place, so a partial file is never mistaken for a cached image
+    part_path = cache_path.with_name(cache_path.name + '.part')
     try:
         # Create cache directory if it doesn't exist
         cache_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # Prefer ranged parallel fetches; aria2c falls back to one stream if the server lacks Range support
+        if aria2c is not None:
+            success, error = _download_image_parallel(url, part_path)
+            if success:
+                os.replace(part_path, cache_path)
+                return True, None
+            log.warning("aria2c download of %s failed, retrying with urllib: %s", url, error)
+            _discard_partial_download(part_path)
+
         # Download the file
-        with urllib.request.urlopen(url) as response, open(cache_path, 'wb') as f:
-            # Download in chunks to handle large files
-            chunk_size = 8192
-            while True:
-                chunk = response.read(chunk_size)
-                if not chunk:
-                    break
-                f.write(chunk)
+        with urllib.request.urlopen(url) as response, open(part_path, 'wb', buffering=0) as f:
+            # Reserve the full size up front so the filesystem can lay the image out contiguously
+            content_length = response.getheader('Content-Length')
+            if content_length and content_length.isdigit() and hasattr(os, 'posix_fallocate'):
+                with contextlib.suppress(OSError):
+                    os.posix_fallocate(f.fileno(), 0, int(content_length))
+            # Stream in large chunks; copyfileobj supplies the buffer, so the file is unbuffered
+            shutil.copyfileobj(response, f, length=_DOWNLOAD_CHUNK_SIZE)
+            written = f.tell()
+
+        # The preallocated file already has the full size, so a short stream would leave a zero-filled tail
+        if content_length and content_length.isdigit() and written != int(content_length):
+            _discard_partial_download(part_path)
+            return False, f"Failed to download image from {url}: received {written} of {content_length} bytes"
+        os.replace(part_path, cache_path)
 
         return True, None
-    except Exception as e:
+    except (OSError, ValueError, http.client.HTTPException) as e:
+        # A preallocated .part file can hold gigabytes, so don't leave it in the pool
+        with contextlib.suppress(OSError):
+            _discard_partial_download(part_path)
+        return False, f"Failed to download image from {url}: {str(e)}"
+
+
+def _download_image_once(url, cache_path):
+    """Download an image unless a concurrent caller already has, holding a lock file meanwhile."""
+    lock_path = _DOWNLOAD_LOCK_DIR / (cache_path.name + '.lock')
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        _DOWNLOAD_LOCK_DIR.mkdir(parents=True, exist_ok=True)
+        lock_fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+    except OSError as e:
         return False, f"Failed to download image from {url}: {str(e)}"
 
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        # Another caller may have finished the download while we waited
+        if cache_path.exists():
+            return True, None
+        return _download_image(url, cache_path)
+    finally:
+        os.close(lock_fd)
+
 
 def _resolve_image_path(path_or_url):
     """Resolve image path, handling URLs and local paths with fallback downloading."""
@@ -212,7 +668,7 @@ def _resolve_image_path(path_or_url):
             return str(cache_path), None
 
         # Download and cache the image
-        success, error = _download_image(path_or_url, cache_path)
+        success, error = _download_image_once(path_or_url, cache_path)
         if success:
             return str(cache_path), None
         else:
@@ -222,19 +678,16 @@ def _resolve_image_path(path_or_url):
     path = Path(path_or_url)
 
     # Check if using SSH connection to remote host
-    if "ssh://" in LIBVIRT_DEFAULT_URI:
-        # Extract hostname from URI like qemu+ssh://user@hostname/system
-        host_part = LIBVIRT_DEFAULT_URI.split("://")[1].split("/")[0]
-
+    host_part = _ssh_host_part(LIBVIRT_DEFAULT_URI)
+    if host_part:
         # Test if remote path exists via SSH
-        try:
-            success, stdout, stderr = ssh_cmd(host_part, f"test -f {path_or_url}", timeout=10)
-            if success:
-                return str(path_or_url), None
-            else:
-                return None, f"Remote image path does not exist: {path_or_url}"
-        except Exception as e:
-            return None, f"Failed to check remote image path: {str(e)}"
+        success, stdout, stderr = ssh_cmd(host_part, f"test -f {shlex.quote(path_or_url)}", timeout=10)
+        if success:
+            return str(path_or_url), None
+        elif stderr:
+            return None, f"Failed to check remote image path: {stderr}"
+        else:
+            return None, f"Remote image path does not exist: {path_or_url}"
     else:
         # Check if local path exists (original behavior)
         if path.exists():
@@ -244,45 +697,94 @@ def _resolve_image_path(path_or_url):
         return None, f"Local image path does not exist: {path_or_url}"
 
 
+# Directories and extensions searched for "<os_name><ext>" images, in priority order
+_IMAGE_DIRS = ("/var/lib/libvirt/images", "/data/libvirt/images")
+_IMAGE_EXTS = (".qcow2", ".img")
+
+# Well-known images tried when no image matches the OS name
+_COMMON_IMAGES = (
+    "/var/lib/libvirt/images/ubuntu-24.04-server-cloudimg-amd64.img",  # Common ubuntu image
+    "/var/lib/libvirt/images/noble-server-cloudimg-amd64.img",  # Common ubuntu image
+    "/data/libvirt/images/ubuntu-24.04-base.qcow2",  # Common custom image
+)
+
+# Short-lived cache of directory listings keyed by path -> (listed_at, names)
+_DIR_LISTING_CACHE = {}
+_DIR_LISTING_TTL = 30.0
+
+
+def _list_dir_files(directory):
+    """Return the names of regular files in a directory, or None if it can't be listed.
+
+    Listings are reused for a short while so bursts of image lookups don't rescan the disk.
+    Failed listings are not cached; image directories are often searchable but not
+    readable (e.g. mode 0711), so callers fall back to checking paths directly.
+    """
+    cached = _DIR_LISTING_CACHE.get(directory)
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < _DIR_LISTING_TTL:
+        return cached[1]
+    _prune_expired(_DIR_LISTING_CACHE, _DIR_LISTING_TTL, now)
+
+    try:
+        with os.scandir(directory) as entries:
+            names = frozenset(entry.name for entry in entries if entry.is_file())
+    except OSError:
+        return None
+    _DIR_LISTING_CACHE[directory] = (now, names)
+    return names
+
+
 def get_os_image_path(os_name: str) -> str:
     """Return the path in the system to a disk with OS installed"""
     # Check multiple possible locations for images
-    possible_paths = [
-        f"/var/lib/libvirt/images/{os_name}.qcow2",
-        f"/data/libvirt/images/{os_name}.qcow2",
-        f"/var/lib/libvirt/images/{os_name}.img",
-        f"/data/libvirt/images/{os_name}.img",
-        "/var/lib/libvirt/images/ubuntu-24.04-server-cloudimg-amd64.img",  # Common ubuntu image
-        "/var/lib/libvirt/images/noble-server-cloudimg-amd64.img",  # Common ubuntu image
-        "/data/libvirt/images/ubuntu-24.04-base.qcow2",  # Common custom image
-    ]
+    possible_paths = [f"{directory}/{os_name}{ext}" for ext in _IMAGE_EXTS for directory in _IMAGE_DIRS]
+    possible_paths.extend(_COMMON_IMAGES)
 
     # If using ssh connection, check remote paths
-    if "ssh://" in LIBVIRT_DEFAULT_URI:
-        host_part = LIBVIRT_DEFAULT_URI.split("://")[1].split("/")[0]
-
-        for path in possible_paths:
-            try:
-                success, stdout, stderr = ssh_cmd(host_part, f"test -f {path}", timeout=5)
-                if success:
-                    return path
-            except Exception:
-                continue
+    host_part = _ssh_host_part(LIBVIRT_DEFAULT_URI)
+    if host_part:
+        # Probe all candidates in one round-trip; the first existing path is echoed back
+        candidates = " ".join(shlex.quote(path) for path in possible_paths)
+        probe = f'for p in {candidates}; do [ -f "$p" ] && echo "$p" && exit 0; done; exit 1'
+        success, stdout, stderr = ssh_cmd(host_part, probe, timeout=10)
+        if success and stdout:
+            return stdout.splitlines()[0]
     else:
-        # Check local paths
+        # Check local paths against cached directory listings instead of a stat() per candidate,
+        # stat()ing directly when a directory can't be listed
         for path in possible_paths:
-            if Path(path).exists():
+            directory, filename = os.path.split(path)
+            names = _list_dir_files(directory)
+            if names is not None:
+                found = filename in names
+            else:
+                found = os.path.isfile(path)
+            if found:
                 return path
 
     # Default fallback
     return f"/var/lib/libvirt/images/{os_name}.qcow2"
 
 
+@functools.lru_cache(maxsize=1)
 def _get_template_env():
-    """Get the Jinja2 template environment configured for the templates directory."""
+    """Get the Jinja2 template environment configured for the templates directory.
+
+    The environment is built once so compiled templates are reused; templates don't
+    change while the server runs, so the per-render mtime check is disabled. XML
+    templates are autoescaped so values such as VM names can't break the markup.
+    """
+    # Imported here since only template rendering needs it
+    import jinja2
+
     template_path = Path(__file__).parent / "templates"
     template_loader = jinja2.FileSystemLoader(template_path)
-    template_env = jinja2.Environment(loader=template_loader)
+    template_env = jinja2.Environment(
+        loader=template_loader,
+        auto_reload=False,
+        autoescape=jinja2.select_autoescape(enabled_extensions=("xml.j2",), default_for_string=False),
+    )
     return template_env
 
 
@@ -328,21 +830,26 @@ def create_network_config(static_ip=None, gateway=None, nameservers=None, interf
     if nameservers is None:
         nameservers = ["8.8.8.8", "8.8.4.4"]
 
-    # Load and render template
-    template_env = _get_template_env()
-    template = template_env.get_template("network-config.yml.j2")
-
     # If interface is None, use a fallback that works with the pattern match
     if interface is None:
         interface = "default"
 
-    network_config = template.render(
+    # Lists aren't hashable, so pass nameservers as a tuple to the cached renderer
+    return _render_network_config(static_ip, gateway, tuple(nameservers), interface)
+
+
+@functools.lru_cache(maxsize=64)
+def _render_network_config(static_ip, gateway, nameservers, interface):
+    """Render network-config.yml.j2, memoized on the (hashable) arguments."""
+    template_env = _get_template_env()
+    template = template_env.get_template("network-config.yml.j2")
+
+    return template.render(
         static_ip=static_ip,
         gateway=gateway,
         nameservers=nameservers,
         interface=interface,
     )
-    return network_config
 
 
 class LibvirtWrapper:
@@ -358,38 +865,54 @@ class LibvirtWrapper:
         Returns:
             tuple: (supported: bool, version: str, message: str)
         """
-        try:
-            # Try to check cloud-init version via SSH if remote connection
-            if "ssh://" in self.uri:
-                try:
-                    # Parse SSH connection info from URI
-                    # Format: qemu+ssh://user@host/system
-                    uri_parts = self.uri.split("://")[1]  # user@host/system
-                    host_part = uri_parts.split("/")[0]  # user@host
+        return _probe_cloud_init(self.uri)
 
-                    result = ssh_cmd(host_part, "cloud-init --version", timeout=10)
-                    version = result.strip().split()[-1] if result else "unknown"
-                    return True, version, f"Cloud-init version {version} found on remote host"
 
-                except Exception as e:
-                    return False, "unknown", f"Could not check cloud-init on remote host: {e}"
+# Probe results per URI; the answer doesn't change for the life of the process
+_CLOUD_INIT_PROBES = {}
 
-            else:
-                # Local check using sh
-                try:
-                    cloud_init = import_sh_cmd('cloud-init')
-                    if cloud_init is None:
-                        return False, "not_found", "Cloud-init not found locally"
 
-                    result = cloud_init("--version", _timeout=10)
-                    version = str(result).strip().split()[-1] if result else "unknown"
-                    return True, version, f"Cloud-init version {version} found locally"
+def _probe_cloud_init(uri):
+    """Return the cached cloud-init probe for a URI, running it on first use.
 
-                except (CommandNotFound, ErrorReturnCode):
-                    return False, "not_found", "Cloud-init not found locally"
+    Transient failures ("unknown"/"error") are not cached so the next call retries.
+    """
+    result = _CLOUD_INIT_PROBES.get(uri)
+    if result is None:
+        result = _run_cloud_init_probe(uri)
+        if result[1] not in ("unknown", "error"):
+            _CLOUD_INIT_PROBES[uri] = result
+    return result
+
+
+def _run_cloud_init_probe(uri):
+    """Check cloud-init on the host behind a URI. Returns (supported, version, message)"""
+    # Try to check cloud-init version via SSH if remote connection
+    host_part = _ssh_host_part(uri)
+    if host_part:
+        success, stdout, stderr = ssh_cmd(host_part, "cloud-init --version", timeout=10)
+        if not success:
+            if "not found" in stderr:
+                return False, "not_found", "Cloud-init not found on remote host"
+            return False, "unknown", f"Could not check cloud-init on remote host: {stderr}"
 
-        except Exception as e:
-            return False, "error", f"Error checking cloud-init support: {e}"
+        version = stdout.split()[-1] if stdout else "unknown"
+        return True, version, f"Cloud-init version {version} found on remote host"
+
+    # Local check using sh
+    if cloud_init is None:
+        return False, "not_found", "Cloud-init not found locally"
+
+    # Accept any exit status and inspect it, rather than treating a failing binary as an exception
+    try:
+        result = cloud_init("--version", _timeout=10, _ok_code=range(256), _return_cmd=True)
+    except sh.TimeoutException as e:
+        return False, "error", f"Error checking cloud-init support: {e}"
+    if result.exit_code != 0:
+        return False, "not_found", "Cloud-init not found locally"
+
+    version = str(result).strip().split()[-1] if result else "unknown"
+    return True, version, f"Cloud-init version {version} found locally"
 
 
 def create_qcow2_with_backing(base_path, vm_name, storage_dir="/var/lib/libvirt/images"):
@@ -403,134 +926,251 @@ def create_qcow2_with_backing(base_path, vm_name, storage_dir="/var/lib/libvirt/
     Returns:
         tuple: (success: bool, qcow2_path: str, error_message: str or None)
     """
+    # Check if we're on Linux or have remote connection
+    if platform.system() != "Linux" and not _ssh_host_part(LIBVIRT_DEFAULT_URI):
+        return False, None, "qemu-img operations are only supported on Linux or remote connections"
+
+    output_path = f"{storage_dir}/{vm_name}.qcow2"
+
+    host_part = _ssh_host_part(LIBVIRT_DEFAULT_URI)
+    if host_part:
+        # Remote operation via SSH: create qcow2 image with backing file on remote host
+        cmd = f"qemu-img create -f qcow2 -b {shlex.quote(base_path)} {shlex.quote(output_path)}"
+        success, stdout, stderr = ssh_cmd(host_part, cmd, timeout=60)
+
+        if success:
+            return True, output_path, None
+        else:
+            return False, None, f"Failed to create qcow2 image via SSH: {stderr or stdout}"
+
+    # Local operation using sh
+    if qemu_img is None:
+        return False, None, "qemu-img command not available"
+
     try:
-        import platform
+        qemu_img("create", "-f", "qcow2", "-b", base_path, output_path, _timeout=60)
+    except (CommandNotFound, ErrorReturnCode, sh.TimeoutException) as e:
+        return False, None, f"Failed to create qcow2 image: {e}"
 
-        # Check if we're on Linux or have remote connection
-        if platform.system() != "Linux" and "ssh://" not in LIBVIRT_DEFAULT_URI:
-            return False, None, "qemu-img operations are only supported on Linux or remote connections"
+    return True, output_path, None
 
-        output_path = f"{storage_dir}/{vm_name}.qcow2"
 
-        if "ssh://" in LIBVIRT_DEFAULT_URI:
-            # Remote operation via SSH
-            try:
-                # Parse SSH connection info from URI
-                uri_parts = LIBVIRT_DEFAULT_URI.split("://")[1]  # user@host/system
-                host_part = uri_parts.split("/")[0]  # user@host
+@functools.lru_cache(maxsize=128)
+def _domain_interfaces(xml_desc):
+    """Return the network interfaces declared in a domain XML, memoized per XML document.
 
-                # Create qcow2 image with backing file on remote host
-                cmd = f"qemu-img create -f qcow2 -b {base_path} {output_path}"
-                result = ssh_cmd(host_part, cmd, timeout=60)
+    Returns:
+        tuple: Read-only sequence of dicts with 'mac', 'type' and 'network' keys
+    """
+    root = ET.fromstring(xml_desc)
+
+    interfaces = []
+    devices = root.find("devices")
+    for iface in devices if devices is not None else ():
+        if iface.tag != "interface":
+            continue
+        # Walk the interface's children once instead of a path search per field
+        mac_elem = source_elem = None
+        for child in iface:
+            if child.tag == "mac" and mac_elem is None:
+                mac_elem = child
+            elif child.tag == "source" and source_elem is None:
+                source_elem = child
+        if mac_elem is not None:
+            iface_info = {
+                'mac': mac_elem.get('address', '').lower(),
+                'type': iface.get('type'),
+                'network': source_elem.get('network') if source_elem is not None else None,
+            }
+            interfaces.append(iface_info)
+    return tuple(interfaces)
+
+
+# ARP entry like: hostname (192.168.1.100) at aa:bb:cc:dd:ee:ff [ether] on eth0
+_ARP_ENTRY_RE = re.compile(rb'\(([0-9.]+)\) at ([0-9a-fA-F:]+)')
+
+
+def _is_ipv4(ip):
+    """Check that a string is a dotted-quad IPv4 address."""
+    if ip.count('.') != 3:
+        return False
+    try:
+        socket.inet_aton(ip)
+    except OSError:
+        return False
+    return True
 
-                if result and "Formatting" in result:
-                    return True, output_path, None
-                else:
-                    return False, None, f"Failed to create qcow2 image: {result}"
 
-            except Exception as e:
-                return False, None, f"Failed to create qcow2 image via SSH: {e}"
+def _arp_table():
+    """Return the system ARP table as a {mac: ip} dict (empty if unavailable)."""
+    # On Linux the kernel exposes the table directly; avoid forking arp(8)
+    try:
+        with open("/proc/net/arp") as f:
+            next(f, None)  # Skip header
+            table = {}
+            for line in f:
+                fields = line.split()
+                # Flags 0x0 marks an incomplete entry with no resolved MAC
+                if len(fields) >= 4 and fields[2] != "0x0":
+                    table.setdefault(fields[3].lower(), fields[0])
+            return table
+    except OSError:
+        pass
+
+    if arp is None:
+        return {}
+    try:
+        # -n skips reverse DNS for every entry, which otherwise dominates the run time
+        result = arp("-an", _timeout=5, _return_cmd=True)
+    except (ErrorReturnCode, CommandNotFound, sh.TimeoutException):
+        return {}
 
-        else:
-            # Local operation using sh
-            try:
-                qemu_img = import_sh_cmd('qemu-img')
-                if qemu_img is None:
-                    return False, None, "qemu-img command not available"
+    # Scan the raw bytes; only the matched fields are decoded
+    table = {}
+    for line in result.stdout.splitlines():
+        match = _ARP_ENTRY_RE.search(line)
+        if match:
+            ip = match.group(1).decode()
+            if _is_ipv4(ip):
+                table.setdefault(match.group(2).decode().lower(), ip)
+    return table
 
-                result = qemu_img("create", "-f", "qcow2", "-b", base_path, output_path, _timeout=60)
-                return True, output_path, None
 
-            except (CommandNotFound, ErrorReturnCode) as e:
-                return False, None, f"Failed to create qcow2 image: {e}"
+# The domain's own <name> element (the first one in libvirt's XML)
+_DOMAIN_NAME_RE = re.compile(r'<name>[^<]*</name>')
 
-    except Exception as e:
-        return False, None, f"Failed to create qcow2 image: {e}"
+
+def _redefine_with_name(conn, domain, new_name):
+    """Rename a stopped domain by undefining it and defining its XML under the new name.
+
+    Fallback for drivers without virDomainRename. Returns the new domain, or None if the
+    XML has no <name> element.
+
+    Raises:
+        libvirt.libvirtError: If libvirt rejects the new definition; the original is restored first.
+    """
+    # Redefine from the persistent config, not the live XML with its runtime-only state. Read it
+    # uncached: a cached copy would carry the old name under the UUID the new definition keeps
+    xml_config = domain.XMLDesc(libvirt.VIR_DOMAIN_XML_INACTIVE)
+
+    # Swap the domain's <name> in place; libvirt always emits it first, so no parse is needed
+    updated_xml, replaced = _DOMAIN_NAME_RE.subn(lambda _: f"<name>{xml_escape(new_name)}</name>", xml_config, count=1)
+    if not replaced:
+        return None
+
+    domain.undefine()
+
+    # Restore the original if the new definition fails (e.g. the name was taken after the cached listing was fetched)
+    try:
+        return conn.defineXML(updated_xml)
+    except libvirt.libvirtError:
+        conn.defineXML(xml_config)
+        raise
+
+
+# Static resource listing, built once rather than on every list://resources read
+_RESOURCES_LIST = {
+    "resources": [
+        {
+            "uri": "images://{os_name}",
+            "name": "Operating System Images",
+            "description": "Return the path to an image in the system with the Distribution installed",
+            "mime_type": "text/plain",
+        }
+    ]
+}
 
 
 def register_handlers(mcp):
-    def _start_vm(vm_name: str):
-        """Start a VM. Returns (success: bool, message: str)"""
+    def _lookup_domain(vm_name: str):
+        """Look up a domain by name. Returns (domain or None, error_msg: str or None)"""
         try:
-            conn = libvirt.open(LIBVIRT_DEFAULT_URI)
+            conn = _get_libvirt_conn()
         except libvirt.libvirtError as e:
-            return False, f"Libvirt error: {str(e)}"
+            return None, f"Libvirt error: {str(e)}"
 
         try:
-            domain = conn.lookupByName(vm_name)
+            return conn.lookupByName(vm_name), None
         except libvirt.libvirtError as e:
-            conn.close()
-            return False, f"VM '{vm_name}' not found: {str(e)}"
+            return None, f"VM '{vm_name}' not found: {str(e)}"
+
+    def _start_vm(vm_name: str, domain=None):
+        """Start a VM, reusing `domain` if the caller already looked it up. Returns (success: bool, message: str)"""
+        if domain is None:
+            domain, error_msg = _lookup_domain(vm_name)
+            if error_msg:
+                return False, error_msg
 
         try:
             # Check if VM is already running
-            if domain.isActive():
-                conn.close()
+            if _domain_is_active(domain):
                 return False, f"VM '{vm_name}' is already running"
 
             # Start the VM
             domain.create()
-            conn.close()
+            _forget_domain_state(domain)
+            _invalidate_xmldesc(domain)
+            _invalidate_vm_ip(domain.connect(), vm_name)
             return True, "OK"
         except libvirt.libvirtError as e:
-            conn.close()
             return False, f"Failed to start VM '{vm_name}': {str(e)}"
 
-    def _stop_vm(vm_name: str, force: bool = False):
-        """Stop a VM. Returns (success: bool, message: str)"""
-        try:
-            conn = libvirt.open(LIBVIRT_DEFAULT_URI)
-        except libvirt.libvirtError as e:
-            return False, f"Libvirt error: {str(e)}"
-
-        try:
-            domain = conn.lookupByName(vm_name)
-        except libvirt.libvirtError as e:
-            conn.close()
-            return False, f"VM '{vm_name}' not found: {str(e)}"
+    def _stop_vm(vm_name: str, force: bool = False, domain=None):
+        """Stop a VM, reusing `domain` if the caller already looked it up. Returns (success: bool, message: str)"""
+        if domain is None:
+            domain, error_msg = _lookup_domain(vm_name)
+            if error_msg:
+                return False, error_msg
 
         try:
-            if domain.isActive():
+            if _domain_is_active(domain):
                 if force:
                     domain.destroy()  # Forceful shutdown
                 else:
                     domain.shutdown()  # Graceful shutdown
-            conn.close()
+                _forget_domain_state(domain)
+                _invalidate_xmldesc(domain)
+                _invalidate_vm_ip(domain.connect(), vm_name)
             return True, "OK"
         except libvirt.libvirtError as e:
-            conn.close()
             return False, f"Failed to stop VM '{vm_name}': {str(e)}"
 
-    def _is_vm_running(vm_name: str):
+    def _is_vm_running(vm_name: str, domain=None):
         """Check if VM is running. Returns (is_running: bool, error_msg: str or None)"""
+        if domain is None:
+            domain, error_msg = _lookup_domain(vm_name)
+            if error_msg:
+                return False, error_msg
+
         try:
-            conn = libvirt.open(LIBVIRT_DEFAULT_URI)
+            return _domain_is_active(domain), None
         except libvirt.libvirtError as e:
-            return False, f"Libvirt error: {str(e)}"
+            return False, f"VM '{vm_name}' not found: {str(e)}"
+
+    def _apply_autostart(vm_name: str):
+        """Enable autostart for a VM. Intended to run off the request path."""
+        host_part = _ssh_host_part(LIBVIRT_DEFAULT_URI)
+        if host_part:
+            # Run virsh on the host over the cached SSH session rather than
+            # pushing the call through libvirt's own SSH transport
+            local_uri = _ssh_local_uri(LIBVIRT_DEFAULT_URI)
+            cmd = f"virsh --connect {shlex.quote(local_uri)} autostart {shlex.quote(vm_name)}"
+            success, stdout, stderr = ssh_cmd(host_part, cmd, timeout=10)
+            if not success:
+                log.warning("Failed to enable autostart for VM '%s': %s", vm_name, stderr)
+            return
 
         try:
-            domain = conn.lookupByName(vm_name)
-            is_active = domain.isActive()
-            conn.close()
-            return is_active, None
+            conn = _get_libvirt_conn()
+            conn.lookupByName(vm_name).setAutostart(1)
         except libvirt.libvirtError as e:
-            conn.close()
-            return False, f"VM '{vm_name}' not found: {str(e)}"
+            log.warning("Failed to enable autostart for VM '%s': %s", vm_name, e)
 
     # List available resources
     @mcp.resource("list://resources")
     def list_resources() -> dict:
         """Return a list of all available resources in this server."""
-        return {
-            "resources": [
-                {
-                    "uri": "images://{os_name}",
-                    "name": "Operating System Images",
-                    "description": "Return the path to an image in the system with the Distribution installed",
-                    "mime_type": "text/plain",
-                }
-            ]
-        }
+        return _RESOURCES_LIST
 
     # Define a resource template with a parameter
     @mcp.resource("images://{os_name}")
@@ -551,38 +1191,33 @@ def register_handlers(mcp):
            IP address if successful, error message otherwise.
         """
         try:
-            conn = libvirt.open(LIBVIRT_DEFAULT_URI)
+            conn = _get_libvirt_conn()
         except libvirt.libvirtError as e:
             return f"Libvirt error: {str(e)}"
 
+        # Repeated lookups for the same VM within a couple of seconds reuse the last answer
+        cached = _cached_vm_ip(conn, vm_name, network_name)
+        if cached is not None:
+            return cached
+
         try:
             domain = conn.lookupByName(vm_name)
         except libvirt.libvirtError as e:
-            conn.close()
             return f"VM '{vm_name}' not found: {str(e)}"
 
-        xml_desc = domain.XMLDesc()
-        root = ET.fromstring(xml_desc)
-
-        # Extract MAC addresses and network information
-        interfaces = []
-        for iface in root.findall("./devices/interface"):
-            mac_elem = iface.find("./mac")
-            source_elem = iface.find("./source")
-            if mac_elem is not None:
-                iface_info = {
-                    'mac': mac_elem.get('address', '').lower(),
-                    'type': iface.get('type'),
-                    'network': source_elem.get('network') if source_elem is not None else None,
-                }
-                interfaces.append(iface_info)
+        # Extract MAC addresses and network information from the persistent definition, which is smaller
+        # than the live XML; NICs attached with --live only are picked up from the live XML further down
+        try:
+            interfaces = _domain_interfaces(_cached_xmldesc(domain, libvirt.VIR_DOMAIN_XML_INACTIVE))
+        except libvirt.libvirtError as e:
+            return f"Failed to get configuration for VM '{vm_name}': {str(e)}"
 
-        if not interfaces:
-            conn.close()
+        is_active = _domain_is_active(domain)
+        if not interfaces and not is_active:
             return f"No network interfaces found for VM '{vm_name}'"
 
         # Method 1: Try libvirt guest agent if available (most accurate for running VMs)
-        if domain.isActive():
+        if is_active:
             try:
                 # Get guest agent interfaces
                 ifaces = domain.interfaceAddresses(libvirt.VIR_DOMAIN_INTERFACE_ADDRESSES_SRC_AGENT)
@@ -596,115 +1231,131 @@ def register_handlers(mcp):
                                 ip = addr['addr']
                                 # Skip loopback addresses
                                 if ip != '127.0.0.1' and not ip.startswith('127.'):
-                                    conn.close()
-                                    return f"{ip} (guest agent via {iface_name})"
+                                    return _remember_vm_ip(conn, vm_name, network_name, f"{ip} (guest agent via {iface_name})")
             except (libvirt.libvirtError, KeyError):
                 # Guest agent not available or error, continue
                 pass
 
-        # Method 2: DHCP lease lookup
-        networks_to_check = []
-        if network_name:
-            networks_to_check = [network_name]
-        else:
-            # Auto-detect networks from VM interfaces
-            for iface in interfaces:
-                if iface['network'] and iface['network'] not in networks_to_check:
-                    networks_to_check.append(iface['network'])
-            # Also check 'default' network as fallback
-            if 'default' not in networks_to_check:
-                networks_to_check.append('default')
-
-        # Check DHCP leases in relevant networks
-        for net_name in networks_to_check:
+        # Method 2: DHCP lease lookup. libvirt can join the VM's MACs against the leases of every
+        # network it is attached to in a single RPC; only running VMs have lease-backed addresses
+        if is_active and not network_name:
             try:
-                network = conn.networkLookupByName(net_name)
-                leases = network.DHCPLeases()
+                ifaces = domain.interfaceAddresses(libvirt.VIR_DOMAIN_INTERFACE_ADDRESSES_SRC_LEASE)
+                for iface_name, iface_data in ifaces.items():
+                    for addr in iface_data.get('addrs') or ():
+                        if addr['type'] == libvirt.VIR_IP_ADDR_TYPE_IPV4:
+                            return _remember_vm_ip(conn, vm_name, network_name, f"{addr['addr']} (DHCP lease via {iface_name})")
+            except (libvirt.libvirtError, KeyError):
+                # Lease source unsupported or unavailable, fall back to per-network leases
+                pass
+
+        def _match_interfaces(interfaces):
+            """Find an IP for the given interfaces from per-network DHCP leases, then the ARP table."""
+            if network_name:
+                networks_to_check = [network_name]
+            else:
+                # Auto-detect networks from VM interfaces, keeping first-seen order without duplicates,
+                # and also check 'default' network as fallback
+                networks_to_check = list(
+                    dict.fromkeys([iface['network'] for iface in interfaces if iface['network']] + ['default'])
+                )
+
+            # Check DHCP leases in relevant networks; each lookup is an RPC, so fetch them concurrently
+            iface_macs = {iface['mac'] for iface in interfaces}
+
+            def _lease_ip(net_name):
+                try:
+                    leases = conn.networkLookupByName(net_name).DHCPLeases()
+                except libvirt.libvirtError:
+                    # Network might not exist or have DHCP
+                    return None
                 for lease in leases:
-                    for iface in interfaces:
-                        if lease['mac'].lower() == iface['mac']:
-                            conn.close()
-                            return f"{lease['ipaddr']} (DHCP from {net_name})"
-            except libvirt.libvirtError:
-                # Network might not exist or have DHCP, continue
-                continue
+                    if lease['mac'].lower() in iface_macs:
+                        return f"{lease['ipaddr']} (DHCP from {net_name})"
+                return None
 
-        # Method 3: ARP table lookup
-        if arp is not None:
+            futures = [_lease_executor.submit(_lease_ip, net_name) for net_name in networks_to_check]
+            try:
+                # Lookups run concurrently, but results are taken in networks_to_check order so the reported
+                # network is stable across calls: a hit on a later network waits for every earlier network to
+                # answer without one, so a slow earlier network still delays it
+                for future in futures:
+                    result = future.result()
+                    if result:
+                        return result
+            finally:
+                # Drop lookups for later networks that haven't started yet
+                for future in futures:
+                    future.cancel()
+
+            # Method 3: ARP table lookup
+            arp_table = _arp_table()
             for iface in interfaces:
-                try:
-                    # Check system ARP table for MAC address
-                    result = arp("-a", _timeout=5)
-                    for line in result.stdout.decode().split('\n'):
-                        if iface['mac'] in line.lower():
-                            # Parse IP from ARP entry like: hostname (192.168.1.100) at aa:bb:cc:dd:ee:ff [ether] on eth0
-                            import re
-
-                            # Simple but robust IPv4 pattern - extract and validate separately
-                            ip_match = re.search(r'\(([0-9.]+)\)', line)
-                            if ip_match:
-                                ip = ip_match.group(1)
-                                # Validate IP address by checking octets
-                                octets = ip.split('.')
-                                if len(octets) == 4:
-                                    try:
-                                        if all(0 <= int(octet) <= 255 for octet in octets):
-                                            conn.close()
-                                            return f"{ip} (ARP table)"
-                                    except ValueError:
-                                        pass  # Invalid octet, continue
-                except (ErrorReturnCode, CommandNotFound):
-                    # ARP lookup failed, continue
-                    continue
-
-        conn.close()
+                ip = arp_table.get(iface['mac'])
+                if ip:
+                    return f"{ip} (ARP table)"
+            return None
+
+        result = _match_interfaces(interfaces) if interfaces else None
+        if result:
+            return _remember_vm_ip(conn, vm_name, network_name, result)
+
+        # NICs hot-plugged with --live only exist in the live XML, so retry with those before giving up
+        if is_active:
+            try:
+                live_interfaces = _domain_interfaces(_cached_xmldesc(domain))
+            except libvirt.libvirtError:
+                live_interfaces = ()
+            known_macs = {iface['mac'] for iface in interfaces}
+            live_only = tuple(iface for iface in live_interfaces if iface['mac'] not in known_macs)
+            if live_only:
+                result = _match_interfaces(live_only)
+                if result:
+                    return _remember_vm_ip(conn, vm_name, network_name, result)
+                interfaces += live_only
+
+        if not interfaces:
+            return f"No network interfaces found for VM '{vm_name}'"
+
         mac_list = [iface['mac'] for iface in interfaces]
         return f"No IP found for VM '{vm_name}' with MACs: {', '.join(mac_list)}"
 
     @mcp.tool()
-    def get_vm_config(vm_name: str) -> str:
+    def get_vm_config(vm_name: str, inactive: bool = False) -> str:
         """
         Get the complete XML configuration of a VM.
 
         Args:
           vm_name: VM name.
+          inactive: Return the persistent definition instead of the live configuration.
 
         Returns:
            Complete XML configuration if successful, error message otherwise.
         """
         try:
-            conn = libvirt.open(LIBVIRT_DEFAULT_URI)
+            conn = _get_libvirt_conn()
         except libvirt.libvirtError as e:
             return f"Libvirt error: {str(e)}"
 
         try:
             domain = conn.lookupByName(vm_name)
         except libvirt.libvirtError as e:
-            conn.close()
             return f"VM '{vm_name}' not found: {str(e)}"
 
         try:
             # Get the complete XML configuration
-            xml_config = domain.XMLDesc()
-            conn.close()
+            xml_config = _cached_xmldesc(domain, libvirt.VIR_DOMAIN_XML_INACTIVE if inactive else 0)
 
             # Pretty-print the XML for better readability
             try:
-                import xml.dom.minidom
-
-                dom = xml.dom.minidom.parseString(xml_config)
-                pretty_xml = dom.toprettyxml(indent="  ")
-                # Remove empty lines and the XML declaration for cleaner output
-                lines = [line for line in pretty_xml.split('\n') if line.strip()]
-                if lines and lines[0].startswith('<?xml'):
-                    lines = lines[1:]  # Remove XML declaration
-                return '\n'.join(lines)
-            except Exception:
+                root = ET.fromstring(xml_config)
+                ET.indent(root, space="  ")
+                return ET.tostring(root, encoding="unicode")
+            except ET.ParseError:
                 # If pretty-printing fails, return raw XML
                 return xml_config
 
         except libvirt.libvirtError as e:
-            conn.close()
             return f"Failed to get configuration for VM '{vm_name}': {str(e)}"
 
     @mcp.tool()
@@ -737,7 +1388,40 @@ def register_handlers(mcp):
         return message
 
     @mcp.tool()
-    def destroy_vm(vm_name: str):
+    def start_vms(vm_names: list[str]) -> dict:
+        """
+        Start several existing VMs concurrently.
+
+        Args:
+          vm_names: List of VM names.
+
+        Returns:
+           A dictionary mapping each VM name to `OK` or an error message.
+        """
+        # Act on each VM once even if it is listed more than once
+        vm_names = list(dict.fromkeys(vm_names))
+        results = _task_executor.map(_start_vm, vm_names)
+        return dict(zip(vm_names, (message for success, message in results), strict=True))
+
+    @mcp.tool()
+    def shutdown_vms(vm_names: list[str]) -> dict:
+        """
+        Shutdown several existing VMs concurrently.
+        Each VM may ignore the request.
+
+        Args:
+          vm_names: List of VM names.
+
+        Returns:
+           A dictionary mapping each VM name to `OK` or an error message.
+        """
+        # Act on each VM once even if it is listed more than once
+        vm_names = list(dict.fromkeys(vm_names))
+        results = _task_executor.map(_stop_vm, vm_names)
+        return dict(zip(vm_names, (message for success, message in results), strict=True))
+
+    @mcp.tool()
+    async def destroy_vm(vm_name: str):
         """
         Destroy an existing VM given its name.
         Note: This destroys the entire infrastructure as VMs are managed as a group.
@@ -749,7 +1433,7 @@ def register_handlers(mcp):
            `OK` if successes, `Error` otherwise.
         """
         # Currently destroys all VMs as they are managed as infrastructure
-        success, result, error = _pulumi_destroy()
+        success, result, error = await _pulumi_destroy()
         if not success:
             return f"Failed to destroy VM infrastructure: {error}"
 
@@ -768,18 +1452,18 @@ def register_handlers(mcp):
           column is the uuid.
         """
         try:
-            conn = libvirt.open(LIBVIRT_DEFAULT_URI)
+            conn = _get_libvirt_conn()
         except libvirt.libvirtError as e:
             return f"Libvirt error: {str(e)}"
 
         vms = {}
 
-        # Get all domains (both active and inactive)
-        for dom in conn.listAllDomains():
-            name = dom.name()
-            is_active = dom.isActive()
-            vms[name] = {'id': dom.ID() if is_active else None, 'active': is_active, 'uuid': dom.UUIDString()}
-        conn.close()
+        # Get all domains (both active and inactive) in a single RPC. Name, ID and UUID are held
+        # client-side, and inactive domains carry ID -1, so no per-domain isActive() call is needed
+        for dom in conn.listAllDomains(0):
+            dom_id = dom.ID()
+            is_active = 1 if dom_id != -1 else 0
+            vms[dom.name()] = {'id': dom_id if is_active else None, 'active': is_active, 'uuid': dom.UUIDString()}
         return vms
 
     @mcp.tool()
@@ -796,7 +1480,7 @@ def register_handlers(mcp):
           `OK` if success, error message otherwise
         """
         try:
-            conn = libvirt.open(LIBVIRT_DEFAULT_URI)
+            conn = _get_libvirt_conn()
         except libvirt.libvirtError as e:
             return f"Libvirt error: {str(e)}"
 
@@ -804,71 +1488,50 @@ def register_handlers(mcp):
             # Look up the domain by its current name
             domain = conn.lookupByName(old_name)
         except libvirt.libvirtError as e:
-            conn.close()
             return f"VM '{old_name}' not found: {str(e)}"
 
         try:
             # Check if VM is running - remember state and stop if needed
-            was_running, error_msg = _is_vm_running(old_name)
+            was_running, error_msg = _is_vm_running(old_name, domain=domain)
             if error_msg:
-                conn.close()
                 return error_msg
             if was_running:
                 # Stop the VM before renaming
-                success, stop_msg = _stop_vm(old_name, force=False)
+                success, stop_msg = _stop_vm(old_name, force=False, domain=domain)
                 if not success:
-                    conn.close()
                     return f"Failed to stop VM '{old_name}' for renaming: {stop_msg}"
 
             # Check if new name already exists
-            try:
-                conn.lookupByName(new_name)
-                conn.close()
+            if new_name in _domain_names(conn):
                 return f"VM with name '{new_name}' already exists"
-            except libvirt.libvirtError:
-                # Good, new name doesn't exist
-                pass
-
-            # Get the current XML configuration
-            xml_config = domain.XMLDesc()
-
-            # Parse XML and update the name
-            root = ET.fromstring(xml_config)
-            name_elem = root.find("name")
-            if name_elem is not None:
-                name_elem.text = new_name
-            else:
-                conn.close()
-                return f"Failed to find name element in VM '{old_name}' configuration"
-
-            # Convert back to XML string
-            updated_xml = ET.tostring(root, encoding='unicode')
 
-            # Undefine the old domain
-            domain.undefine()
+            _invalidate_xmldesc(domain)
+            _invalidate_vm_ip(conn, old_name)
+            _DOMAIN_NAMES_CACHE.pop(_conn_uri(conn), None)
 
-            # Define the new domain with updated XML
-            conn.defineXML(updated_xml)
-
-            conn.close()
+            # Let libvirt rename in place, keeping UUID and NVRAM; older drivers lack support
+            try:
+                domain.rename(new_name, 0)
+            except libvirt.libvirtError as e:
+                if e.get_error_code() != libvirt.VIR_ERR_NO_SUPPORT:
+                    raise
+                domain = _redefine_with_name(conn, domain, new_name)
+                if domain is None:
+                    return f"Failed to find name element in VM '{old_name}' configuration"
 
             # If VM was running before, start it again with the new name
             if was_running:
-                success, start_msg = _start_vm(new_name)
+                success, start_msg = _start_vm(new_name, domain=domain)
                 if not success:
                     return f"VM renamed successfully but failed to restart: {start_msg}"
 
             return "OK"
 
         except libvirt.libvirtError as e:
-            conn.close()
             return f"Failed to rename VM '{old_name}' to '{new_name}': {str(e)}"
-        except ET.ParseError as e:
-            conn.close()
-            return f"Failed to parse XML configuration for VM '{old_name}': {str(e)}"
 
     @mcp.tool()
-    def create_vm(
+    async def create_vm(
         name: str,
         cores: int,
         memory: int,
@@ -910,28 +1573,25 @@ def register_handlers(mcp):
             pass
 
         # Use Pulumi to create the VM infrastructure
-        success, result, error = _pulumi_up()
+        success, result, error = await _pulumi_up()
         if not success:
             return f"Failed to create VM infrastructure: {error}"
 
-        # Get VM information from Pulumi output
-        success, output, error = _pulumi_stack_output()
-        if success and output:
-            vm_names = output.get('all_vm_names', [])
-            if name in vm_names or len(vm_names) > 0:
-                return "OK"
+        # Toggling autostart doesn't need to block the response
+        if autostart:
+            _task_executor.submit(_apply_autostart, name)
 
         return "OK"
 
     @mcp.tool()
-    def preview() -> str:
+    async def preview() -> str:
         """
         Preview changes that would be made to infrastructure without applying them.
 
         Returns:
             Preview information in JSON format or error message.
         """
-        success, result, error = _pulumi_preview()
+        success, result, error = await _pulumi_preview()
         if not success:
             return f"Preview failed: {error}"
 
@@ -944,19 +1604,19 @@ def register_handlers(mcp):
         return json.dumps(result, indent=2) if result else "No changes"
 
     @mcp.tool()
-    def deploy() -> str:
+    async def deploy() -> str:
         """
         Deploy VMs and infrastructure.
 
         Returns:
             Success message or error details.
         """
-        success, result, error = _pulumi_up()
+        success, result, error = await _pulumi_up()
         if not success:
             return f"Deployment failed: {error}"
 
         # Get deployment outputs
-        success, output, error = _pulumi_stack_output()
+        success, output, error = await _pulumi_stack_output()
         if success and output:
             vm_count = output.get('vm_count', 0)
             vm_ips = output.get('all_vm_ips', [])
@@ -965,28 +1625,28 @@ def register_handlers(mcp):
         return "VM deployment completed successfully"
 
     @mcp.tool()
-    def destroy_all() -> str:
+    async def destroy_all() -> str:
         """
         Destroy all VMs and infrastructure.
 
         Returns:
             Success message or error details.
         """
-        success, result, error = _pulumi_destroy()
+        success, result, error = await _pulumi_destroy()
         if not success:
             return f"Destroy failed: {error}"
 
         return "All VMs and infrastructure destroyed successfully"
 
     @mcp.tool()
-    def get_outputs() -> str:
+    async def get_outputs() -> str:
         """
         Get current infrastructure outputs including VM information.
 
         Returns:
             JSON formatted output information or error message.
         """
-        success, output, error = _pulumi_stack_output()
+        success, output, error = await _pulumi_stack_output()
         if not success:
             return f"Failed to get outputs: {error}"
 
@@ -996,14 +1656,14 @@ def register_handlers(mcp):
             return "No outputs available"
 
     @mcp.tool()
-    def get_status() -> str:
+    async def get_status() -> str:
         """
         Get status of VMs and infrastructure including IPs and configuration.
 
         Returns:
             VM status information or error message.
         """
-        success, output, error = _pulumi_stack_output()
+        success, output, error = await _pulumi_stack_output()
         if not success:
             return f"Failed to get status: {error}"
 